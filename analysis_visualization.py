@@ -2,14 +2,69 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from wordcloud import WordCloud
+from wordcloud import WordCloud, STOPWORDS
 from collections import Counter
 import re
+import pyarrow as pa
+import pyarrow.compute as pc
 
 # Set style for better visualizations
 plt.style.use('default')
 sns.set_palette("husl")
 
+def top_counts(series, n):
+    """Return the n most frequent values of a Series, largest first"""
+    counts = series.value_counts(sort=False)
+    # Categoricals also report unused categories; those are not in the data
+    counts = counts[counts > 0]
+    vals = counts.to_numpy()
+    
+    # Partial sort: only the top n counts are ordered
+    if n < len(vals):
+        idx = np.argpartition(-vals, n)[:n]
+    else:
+        idx = np.arange(len(vals))
+    idx = idx[np.argsort(-vals[idx], kind='stable')]
+    
+    return counts.iloc[idx]
+
+def count_by_year(years):
+    """Count publications per year with np.bincount, sorted by year"""
+    years = years.to_numpy()
+    if len(years) == 0:
+        return pd.Series([], dtype='int64', name='count')
+    
+    # Years span a small integer range, so a dense histogram beats hashing
+    offset = years.min()
+    counts = np.bincount(years - offset)
+    yearly_counts = pd.Series(counts, index=np.arange(offset, offset + len(counts)), name='count')
+    
+    return yearly_counts[yearly_counts > 0]
+
+def word_frequencies(texts, stop_words=STOPWORDS):
+    """Count lower-cased words of a text Series with Arrow compute kernels"""
+    arr = pa.array(texts.dropna(), type=pa.large_string())
+    # WordCloud's \w[\w']* words, spelled with Unicode classes because
+    # RE2's \w is ASCII-only and would split accented and CJK words
+    tokens = pc.list_flatten(pc.split_pattern_regex(pc.utf8_lower(arr), pattern=r"[^\p{L}\p{N}_']+"))
+    tokens = pc.utf8_trim(pc.replace_substring_regex(tokens, pattern="'s$", replacement=''), characters="'")
+    
+    # Drop empty tokens, pure numbers and stop words
+    stop_set = pa.array(sorted(stop_words), type=pa.large_string())
+    keep = pc.and_(
+        pc.and_(pc.greater(pc.utf8_length(tokens), 0), pc.invert(pc.utf8_is_numeric(tokens))),
+        pc.invert(pc.is_in(tokens, value_set=stop_set)),
+    )
+    counts = pc.value_counts(pc.filter(tokens, keep))
+    freqs = dict(zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist()))
+    
+    # Fold plurals into their singular, as WordCloud's normalize_plurals does
+    for word in [w for w in freqs if w.endswith('s') and not w.endswith('ss')]:
+        if word[:-1] in freqs:
+            freqs[word[:-1]] += freqs.pop(word)
+    
+    return freqs
+
 class CORD19Visualizer:
     def __init__(self, df):
         self.df = df
@@ -19,7 +74,7 @@ class CORD19Visualizer:
         plt.figure(figsize=(12, 6))
         
         # Group by year and count
-        yearly_counts = self.df['publication_year'].value_counts().sort_index()
+        yearly_counts = count_by_year(self.df['publication_year'])
         
         # Filter out any invalid years
         yearly_counts = yearly_counts[yearly_counts.index >= 2019]
@@ -30,8 +85,9 @@ class CORD19Visualizer:
         plt.ylabel('Number of Publications', fontsize=12)
         plt.grid(True, alpha=0.3)
         
-        # Add value annotations
-        for year, count in yearly_counts.items():
+        # Add value annotations, thinned out when there are many points
+        step = max(1, len(yearly_counts) // 20)
+        for year, count in yearly_counts.iloc[::step].items():
             plt.annotate(f'{count:,}', (year, count), 
                         textcoords="offset points", xytext=(0,10), ha='center')
         
@@ -46,7 +102,7 @@ class CORD19Visualizer:
         plt.figure(figsize=(12, 8))
         
         # Get top journals
-        journal_counts = self.df['journal'].value_counts().head(top_n)
+        journal_counts = top_counts(self.df['journal'], top_n)
         
         # Create horizontal bar chart
         bars = plt.barh(range(len(journal_counts)), journal_counts.values)
@@ -55,10 +111,7 @@ class CORD19Visualizer:
         plt.xlabel('Number of Publications', fontsize=12)
         
         # Add value labels on bars
-        for i, bar in enumerate(bars):
-            width = bar.get_width()
-            plt.text(width, bar.get_y() + bar.get_height()/2, 
-                    f' {width:,}', ha='left', va='center')
+        plt.gca().bar_label(bars, labels=[f'{v:,}' for v in journal_counts.values], padding=2)
         
         plt.tight_layout()
         plt.savefig(save_path, dpi=300, bbox_inches='tight')
@@ -68,33 +121,27 @@ class CORD19Visualizer:
     
     def generate_word_cloud(self, save_path='wordcloud.png'):
         """Generate word cloud from paper titles"""
-        # Combine all titles
-        text = ' '.join(self.df['title'].dropna().astype(str))
-        
         # Clean text - remove special characters and common words
         stop_words = ['using', 'based', 'study', 'analysis', 'covid', '19', 
                      'sars', 'cov', '2', 'coronavirus', 'pandemic']
         
+        # Tokenize all titles once and count words
+        freqs = word_frequencies(self.df['title'], stop_words)
+        
         # Generate word cloud
         wordcloud = WordCloud(width=800, height=400, 
                              background_color='white',
-                             stopwords=stop_words,
                              max_words=100,
-                             colormap='viridis').generate(text)
+                             colormap='viridis').generate_from_frequencies(freqs)
         
-        plt.figure(figsize=(12, 6))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.title('Most Frequent Words in Paper Titles', fontsize=16, fontweight='bold')
-        plt.axis('off')
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
+        # The word cloud is already a raster image; save it without matplotlib
+        wordcloud.to_file(save_path)
     
     def plot_source_distribution(self, save_path='source_distribution.png'):
         """Plot distribution of papers by source"""
         plt.figure(figsize=(10, 6))
         
-        source_counts = self.df['source_x'].value_counts().head(10)
+        source_counts = top_counts(self.df['source_x'], 10)
         
         plt.pie(source_counts.values, labels=source_counts.index, autopct='%1.1f%%')
         plt.title('Distribution of Papers by Source', fontsize=16, fontweight='bold')
@@ -108,18 +155,18 @@ class CORD19Visualizer:
         """Plot distribution of abstract lengths"""
         plt.figure(figsize=(12, 6))
         
-        # Filter out papers without abstracts
-        df_with_abstracts = self.df[self.df['has_abstract']]
+        # Filter out papers without abstracts, gathering only the counts
+        vals = self.df.loc[self.df['has_abstract'], 'abstract_word_count'].to_numpy()
         
-        plt.hist(df_with_abstracts['abstract_word_count'], bins=50, alpha=0.7, edgecolor='black')
+        plt.hist(vals, bins=50, alpha=0.7, edgecolor='black')
         plt.title('Distribution of Abstract Word Counts', fontsize=16, fontweight='bold')
         plt.xlabel('Word Count')
         plt.ylabel('Number of Papers')
         plt.grid(True, alpha=0.3)
         
         # Add statistics
-        mean_length = df_with_abstracts['abstract_word_count'].mean()
-        median_length = df_with_abstracts['abstract_word_count'].median()
+        mean_length = vals.mean()
+        median_length = np.median(vals)
         
         plt.axvline(mean_length, color='red', linestyle='--', label=f'Mean: {mean_length:.1f}')
         plt.axvline(median_length, color='green', linestyle='--', label=f'Median: {median_length:.1f}')
@@ -158,7 +205,7 @@ class CORD19Visualizer:
 # Usage example
 if __name__ == "__main__":
     # Load cleaned data
-    cleaned_df = pd.read_csv('cleaned_metadata.csv')
+    cleaned_df = pd.read_parquet('cleaned_metadata.parquet', engine='pyarrow')
     
     # Initialize visualizer
     visualizer = CORD19Visualizer(cleaned_df)
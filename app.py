@@ -1,9 +1,13 @@
+import io
+import os
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from wordcloud import WordCloud
 import numpy as np
+import polars as pl
+from analysis_visualization import word_frequencies
 
 # Set page configuration
 st.set_page_config(
@@ -13,18 +17,86 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+DATA_PATH = 'cleaned_metadata.parquet'
+APP_COLUMNS = ['title', 'journal', 'publication_year', 'abstract_word_count',
+               'source_x', 'has_abstract', 'title_word_count']
+
+def _year_series(counts):
+    """Turn a Polars publication_year/len frame into a pandas Series"""
+    return pd.Series(counts['len'].to_numpy(), index=counts['publication_year'].to_numpy(), name='count')
+
+def _journal_series(counts):
+    """Turn a Polars journal/len frame into a pandas Series"""
+    return pd.Series(counts['len'].to_numpy(), index=counts['journal'].cast(pl.String).to_list(), name='count')
+
+def _top_journal_plan(lf, n=10):
+    """Top-n journals by paper count, for a LazyFrame or a DataFrame"""
+    return (
+        lf.drop_nulls('journal')
+        .group_by('journal').len()
+        .top_k(n, by='len')
+        .sort('len', descending=True)
+    )
+
+# Cached results are keyed on the Parquet file's mtime, so re-running the
+# cleaning script invalidates them without restarting the app
+@st.cache_data(max_entries=2)
+def _dataset_overview(path, mtime):
+    """Yearly counts and top journals of the full dataset, for the sidebar"""
+    lf = pl.scan_parquet(path)
+    year_counts, top_journals = pl.collect_all([
+        lf.group_by('publication_year').len().sort('publication_year'),
+        _top_journal_plan(lf),
+    ])
+    return _year_series(year_counts), top_journals['journal'].cast(pl.String).to_list()
+
+# Each entry holds a filtered frame, so only a few filter states are kept
+@st.cache_data(max_entries=8)
+def _run_query(filters, mtime, _lf, _full_year_counts):
+    """Collect the filtered rows once and aggregate them for the charts"""
+    filtered = _lf.collect()
+    
+    year_range, selected_journals, has_abstract = filters
+    if not selected_journals and has_abstract == 'All':
+        # Only the year slider is active: slice the cached full counts
+        year_counts = _full_year_counts.loc[year_range[0]:year_range[1]]
+    else:
+        year_counts = _year_series(filtered.group_by('publication_year').len().sort('publication_year'))
+    
+    journal_counts = _top_journal_plan(filtered)
+    return filtered.to_pandas(), year_counts, _journal_series(journal_counts)
+
+@st.cache_data(max_entries=32)
+def _wordcloud_png(filters, mtime, _titles):
+    """Render the title word cloud as PNG bytes, keyed on the filter state"""
+    freqs = word_frequencies(_titles)
+    if not freqs:
+        return None
+    
+    wordcloud = WordCloud(width=800, height=400, 
+                        background_color='white',
+                        max_words=100,
+                        colormap='viridis').generate_from_frequencies(freqs)
+    
+    buf = io.BytesIO()
+    wordcloud.to_image().save(buf, 'PNG')
+    return buf.getvalue()
+
 class CORD19App:
     def __init__(self):
-        self.df = None
+        self.lf = None
+        self.mtime = None
+        self.year_counts = None
+        self.top_journals = None
         
         self.load_data()
     
     def load_data(self):
         """Load the cleaned dataset"""
         try:
-            self.df = pd.read_csv('cleaned_metadata.csv')
-            # Convert publication_year to integer for filtering
-            self.df['publication_year'] = self.df['publication_year'].astype(int)
+            self.mtime = os.path.getmtime(DATA_PATH)
+            self.year_counts, self.top_journals = _dataset_overview(DATA_PATH, self.mtime)
+            self.lf = pl.scan_parquet(DATA_PATH).select(APP_COLUMNS)
         except FileNotFoundError:
             st.error("Cleaned data file not found. Please run the data cleaning script first.")
             st.stop()
@@ -35,8 +107,8 @@ class CORD19App:
         st.sidebar.markdown("Explore COVID-19 research publications")
         
         # Year range filter
-        min_year = int(self.df['publication_year'].min())
-        max_year = int(self.df['publication_year'].max())
+        min_year = int(self.year_counts.index.min())
+        max_year = int(self.year_counts.index.max())
         
         st.sidebar.subheader("Publication Year Filter")
         year_range = st.sidebar.slider(
@@ -48,7 +120,7 @@ class CORD19App:
         
         # Journal filter
         st.sidebar.subheader("Journal Filter")
-        top_journals = self.df['journal'].value_counts().head(10).index.tolist()
+        top_journals = self.top_journals
         selected_journals = st.sidebar.multiselect(
             "Select journals:",
             options=top_journals,
@@ -65,26 +137,22 @@ class CORD19App:
         return year_range, selected_journals, has_abstract
     
     def apply_filters(self, year_range, selected_journals, has_abstract):
-        """Apply filters to the dataset"""
-        filtered_df = self.df.copy()
-        
+        """Apply filters to the dataset as a lazy query"""
         # Apply year filter
-        filtered_df = filtered_df[
-            (filtered_df['publication_year'] >= year_range[0]) & 
-            (filtered_df['publication_year'] <= year_range[1])
-        ]
+        predicate = pl.col('publication_year').is_between(year_range[0], year_range[1])
         
         # Apply journal filter
         if selected_journals:
-            filtered_df = filtered_df[filtered_df['journal'].isin(selected_journals)]
+            predicate &= pl.col('journal').is_in(list(selected_journals))
         
         # Apply abstract filter
         if has_abstract == 'With Abstract':
-            filtered_df = filtered_df[filtered_df['has_abstract'] == True]
+            predicate &= pl.col('has_abstract')
         elif has_abstract == 'Without Abstract':
-            filtered_df = filtered_df[filtered_df['has_abstract'] == False]
+            predicate &= ~pl.col('has_abstract')
         
-        return filtered_df
+        # Nothing is read until _run_query collects the query
+        return self.lf.filter(predicate)
     
     def display_overview(self, filtered_df):
         """Display overview statistics"""
@@ -110,12 +178,10 @@ class CORD19App:
             avg_abstract_len = filtered_df[filtered_df['has_abstract']]['abstract_word_count'].mean()
             st.metric("Avg Abstract Length", f"{avg_abstract_len:.1f} words")
     
-    def plot_publications_chart(self, filtered_df):
+    def plot_publications_chart(self, yearly_counts):
         """Plot publications over time"""
         st.subheader("Publications Over Time")
         
-        yearly_counts = filtered_df['publication_year'].value_counts().sort_index()
-        
         fig, ax = plt.subplots(figsize=(10, 4))
         ax.plot(yearly_counts.index, yearly_counts.values, marker='o', linewidth=2)
         ax.set_title('Publications by Year')
@@ -124,38 +190,29 @@ class CORD19App:
         ax.grid(True, alpha=0.3)
         
         st.pyplot(fig)
+        plt.close(fig)
     
-    def plot_top_journals_chart(self, filtered_df):
+    def plot_top_journals_chart(self, journal_counts):
         """Plot top journals"""
         st.subheader("Top Publishing Journals")
         
-        journal_counts = filtered_df['journal'].value_counts().head(10)
-        
         fig, ax = plt.subplots(figsize=(10, 5))
         journal_counts.plot(kind='barh', ax=ax)
         ax.set_title('Top 10 Journals')
         ax.set_xlabel('Number of Publications')
         
         st.pyplot(fig)
+        plt.close(fig)
     
-    def generate_word_cloud_chart(self, filtered_df):
+    def generate_word_cloud_chart(self, filtered_df, filters):
         """Generate word cloud"""
         st.subheader("Word Cloud - Paper Titles")
         
-        text = ' '.join(filtered_df['title'].dropna().astype(str))
+        # Titles are only joined and laid out when the filters change
+        png = _wordcloud_png(filters, self.mtime, filtered_df['title'])
         
-        if text.strip():
-            wordcloud = WordCloud(width=800, height=400, 
-                                background_color='white',
-                                max_words=100,
-                                colormap='viridis').generate(text)
-            
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.imshow(wordcloud, interpolation='bilinear')
-            ax.axis('off')
-            ax.set_title('Most Frequent Words in Titles')
-            
-            st.pyplot(fig)
+        if png is not None:
+            st.image(png, caption='Most Frequent Words in Titles')
         else:
             st.info("No data available for word cloud generation.")
     
@@ -181,8 +238,11 @@ class CORD19App:
         # Setup sidebar and get filters
         year_range, selected_journals, has_abstract = self.setup_sidebar()
         
-        # Apply filters
-        filtered_df = self.apply_filters(year_range, selected_journals, has_abstract)
+        filters = (tuple(year_range), tuple(selected_journals), has_abstract)
+        
+        # Apply filters; the query is read once per filter change
+        filtered_lf = self.apply_filters(year_range, selected_journals, has_abstract)
+        filtered_df, yearly_counts, journal_counts = _run_query(filters, self.mtime, filtered_lf, self.year_counts)
         
         # Display overview
         self.display_overview(filtered_df)
@@ -191,11 +251,11 @@ class CORD19App:
         col1, col2 = st.columns(2)
         
         with col1:
-            self.plot_publications_chart(filtered_df)
-            self.plot_top_journals_chart(filtered_df)
+            self.plot_publications_chart(yearly_counts)
+            self.plot_top_journals_chart(journal_counts)
         
         with col2:
-            self.generate_word_cloud_chart(filtered_df)
+            self.generate_word_cloud_chart(filtered_df, filters)
             
             # Additional statistics
             st.subheader("Quick Statistics")
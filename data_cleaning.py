@@ -1,8 +1,137 @@
 import pandas as pd
 import numpy as np
+import polars as pl
+import pyarrow as pa
 from datetime import datetime
 import re
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Low-cardinality text columns stored as pandas categoricals after cleaning
+CATEGORICAL_COLUMNS = ('journal', 'source_x', 'source_type')
+
+# Smallest dtypes that hold the derived numeric columns
+COMPACT_DTYPES = {
+    'publication_year': 'int16',
+    'publication_month': 'int8',
+    'publication_quarter': 'int8',
+    'abstract_word_count': 'int32',
+    'title_word_count': 'int16',
+    'has_abstract': bool,
+}
+
+# CORD-19 publish_time values are ISO dates, with some year-only entries
+DATE_FORMAT = '%Y-%m-%d'
+
+# Word separators are exactly the characters str.split() splits on
+# (str.isspace()), including U+00A0, U+2009 and the \x1c-\x1f separators.
+# The table covers the Basic Multilingual Plane, which holds all of them.
+_WHITESPACE = np.array([chr(c).isspace() for c in range(0x10000)])
+
+# Per-byte tables for the NumPy path: ASCII whitespace bytes, and the UTF-8
+# lead bytes that can start a multibyte whitespace character (C2, E1-E3)
+_BYTE_WS = np.zeros(256, dtype=bool)
+_BYTE_WS[:0x80] = _WHITESPACE[:0x80]
+_WS_LEAD = np.zeros(256, dtype=bool)
+_WS_LEAD[[chr(c).encode()[0] for c in np.flatnonzero(_WHITESPACE) if c >= 0x80]] = True
+
+# Bytes of text classified per step by the NumPy word counter
+_CHUNK_BYTES = 1 << 23
+
+# Regex form of the same word definition, for the Polars pipeline
+WORD_PATTERN = '[^' + ''.join(f'\\x{{{c:X}}}' for c in np.flatnonzero(_WHITESPACE)) + ']+'
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _word_counts_kernel(buf, offsets, whitespace, out):
+        """Count words per row in parallel, one scan over each row's bytes"""
+        for i in prange(out.shape[0]):
+            count = 0
+            in_word = False
+            j = offsets[i]
+            while j < offsets[i + 1]:
+                # Decode one UTF-8 sequence; 4-byte ones are never whitespace
+                b = np.int64(buf[j])
+                if b < 0x80:
+                    cp, size = b, 1
+                elif b < 0xE0:
+                    cp, size = ((b & 0x1F) << 6) | (buf[j + 1] & 0x3F), 2
+                elif b < 0xF0:
+                    cp = ((b & 0x0F) << 12) | ((buf[j + 1] & 0x3F) << 6) | (buf[j + 2] & 0x3F)
+                    size = 3
+                else:
+                    cp, size = 0x10000, 4
+                if cp < whitespace.shape[0] and whitespace[cp]:
+                    in_word = False
+                elif not in_word:
+                    count += 1
+                    in_word = True
+                j += size
+            out[i] = count
+else:
+    _word_counts_kernel = None
+
+def _count_words_chunk(buf, offsets):
+    """NumPy word counts for the rows whose bytes are buf[offsets[0]:offsets[-1]]"""
+    buf = buf[offsets[0]:offsets[-1]]
+    offsets = offsets - offsets[0]
+    
+    # Classify bytes with one lookup; only the rare lead bytes that can start
+    # a multibyte whitespace character are decoded. Arrow strings are valid
+    # UTF-8, so every lead byte has its continuation bytes.
+    is_ws = _BYTE_WS[buf]
+    lead = np.flatnonzero(_WS_LEAD[buf])
+    two = lead[buf[lead] == 0xC2]
+    cp2 = ((buf[two] & 0x1F).astype(np.int32) << 6) | (buf[two + 1] & 0x3F)
+    three = lead[buf[lead] != 0xC2]
+    cp3 = (((buf[three] & 0x0F).astype(np.int32) << 12)
+           | ((buf[three + 1] & 0x3F).astype(np.int32) << 6)
+           | (buf[three + 2] & 0x3F))
+    for pos, cp, size in ((two, cp2, 2), (three, cp3, 3)):
+        hit = pos[_WHITESPACE[cp]]
+        for k in range(size):
+            is_ws[hit + k] = True
+    
+    # A word starts at a non-whitespace byte preceded by whitespace or a row start
+    nonempty = offsets[:-1] < offsets[1:]
+    row_starts = offsets[:-1][nonempty]
+    starts = ~is_ws
+    starts[1:] &= is_ws[:-1]
+    starts[row_starts] = ~is_ws[row_starts]
+    
+    # Sum the flags per row; empty rows have no bytes and keep a count of 0
+    counts = np.zeros(len(offsets) - 1, dtype=np.int32)
+    if len(row_starts):
+        counts[nonempty] = np.add.reduceat(starts, row_starts, dtype=np.int32)
+    return counts
+
+def _count_words(series):
+    """Count words per row, as len(str.split()), on the raw UTF-8 buffer"""
+    arr = pa.array(series, type=pa.large_string())
+    offsets = np.frombuffer(arr.buffers()[1], dtype=np.int64)[arr.offset:arr.offset + len(arr) + 1]
+    data = arr.buffers()[2]
+    buf = np.frombuffer(data, dtype=np.uint8)[:offsets[-1]] if data is not None else np.empty(0, np.uint8)
+    
+    if _word_counts_kernel is not None:
+        # Numba needs no per-byte temporaries at all
+        out = np.empty(len(arr), dtype=np.int32)
+        _word_counts_kernel(buf, offsets, _WHITESPACE, out)
+        return out
+    
+    # The NumPy temporaries take several bytes per text byte (reduceat casts
+    # the flags to int32), so rows are processed in chunks of _CHUNK_BYTES
+    counts = np.zeros(len(arr), dtype=np.int32)
+    lo = 0
+    while lo < len(arr):
+        hi = np.searchsorted(offsets, offsets[lo] + _CHUNK_BYTES, side='right') - 1
+        hi = min(max(hi, lo + 1), len(arr))
+        counts[lo:hi] = _count_words_chunk(buf, offsets[lo:hi + 1])
+        lo = hi
+    return counts
+
 class CORD19Cleaner:
     def __init__(self, df):
         self.df = df.copy()
@@ -44,14 +173,21 @@ class CORD19Cleaner:
         
         # Convert publish_time to datetime
         try:
-            self.df_cleaned['publish_time'] = pd.to_datetime(
-                self.df_cleaned['publish_time'], errors='coerce'
-            )
+            # An explicit format avoids per-string format inference;
+            # year-only dates are parsed in a second pass over the misses
+            raw = self.df_cleaned['publish_time']
+            publish_time = pd.to_datetime(raw, format=DATE_FORMAT, errors='coerce')
+            year_only = pd.to_datetime(raw.where(publish_time.isna()), format='%Y', errors='coerce')
+            publish_time = publish_time.fillna(year_only)
             
             # Extract year, month, and quarter
-            self.df_cleaned['publication_year'] = self.df_cleaned['publish_time'].dt.year
-            self.df_cleaned['publication_month'] = self.df_cleaned['publish_time'].dt.month
-            self.df_cleaned['publication_quarter'] = self.df_cleaned['publish_time'].dt.quarter
+            dt = publish_time.dt
+            self.df_cleaned = self.df_cleaned.assign(
+                publish_time=publish_time,
+                publication_year=dt.year,
+                publication_month=dt.month,
+                publication_quarter=dt.quarter,
+            )
             
             # Remove rows where year extraction failed
             self.df_cleaned = self.df_cleaned[self.df_cleaned['publication_year'].notna()]
@@ -69,14 +205,10 @@ class CORD19Cleaner:
         print("\n=== CREATING NEW FEATURES ===")
         
         # Abstract word count
-        self.df_cleaned['abstract_word_count'] = self.df_cleaned['abstract'].apply(
-            lambda x: len(str(x).split()) if pd.notna(x) else 0
-        )
+        self.df_cleaned['abstract_word_count'] = _count_words(self.df_cleaned['abstract'])
         
         # Title word count
-        self.df_cleaned['title_word_count'] = self.df_cleaned['title'].apply(
-            lambda x: len(str(x).split()) if pd.notna(x) else 0
-        )
+        self.df_cleaned['title_word_count'] = _count_words(self.df_cleaned['title'])
         
         # Has abstract flag
         self.df_cleaned['has_abstract'] = self.df_cleaned['abstract'] != 'No abstract available'
@@ -84,11 +216,72 @@ class CORD19Cleaner:
         # Source type (simplified)
         self.df_cleaned['source_type'] = self.df_cleaned['source_x'].fillna('Unknown')
         
+        self._compact_dtypes()
+        
         self.cleaning_steps.append("Created new features: word counts, flags, and source type")
         print("New features created successfully")
         
         return self.df_cleaned
     
+    def _compact_dtypes(self):
+        """Shrink the cleaned columns to categorical and narrow numeric dtypes"""
+        # Categorical codes make value_counts/isin cheaper on these columns
+        for c in CATEGORICAL_COLUMNS:
+            self.df_cleaned[c] = self.df_cleaned[c].astype('category')
+        
+        # Narrow dtypes cut the bytes moved by every mask and groupby
+        self.df_cleaned = self.df_cleaned.astype(COMPACT_DTYPES)
+    
+    def clean_lazy(self):
+        """Run all cleaning steps as a single Polars lazy query"""
+        print("=== CLEANING (LAZY PIPELINE) ===")
+        
+        original_rows = self.df.shape[0]
+        
+        # Arrow-backed columns (as loaded by CORD19Analyzer) are handed to
+        # Polars without a copy; the column projection already happened
+        # in the CSV reader
+        source = pl.from_arrow(pa.Table.from_pandas(self.df, preserve_index=False))
+        
+        lf = (
+            source.lazy()
+            .drop_nulls(['title', 'publish_time'])
+            .with_columns([
+                pl.col('abstract').fill_null('No abstract available'),
+                pl.coalesce([
+                    pl.col('publish_time').str.to_datetime(DATE_FORMAT, strict=False),
+                    pl.col('publish_time').str.to_datetime('%Y', strict=False),
+                ]),
+            ])
+            .with_columns([
+                pl.col('publish_time').dt.year().alias('publication_year'),
+                pl.col('publish_time').dt.month().alias('publication_month'),
+                pl.col('publish_time').dt.quarter().alias('publication_quarter'),
+                pl.col('abstract').str.count_matches(WORD_PATTERN).cast(pl.Int32).alias('abstract_word_count'),
+                pl.col('title').str.count_matches(WORD_PATTERN).cast(pl.Int32).alias('title_word_count'),
+                (pl.col('abstract') != 'No abstract available').alias('has_abstract'),
+                pl.col('source_x').fill_null('Unknown').alias('source_type'),
+            ])
+            .drop_nulls('publication_year')
+        )
+        
+        # Filters, date parsing and features are evaluated in one pass
+        self.df_cleaned = lf.collect().to_pandas(use_pyarrow_extension_array=True)
+        # Same datetime dtype as process_dates produces
+        self.df_cleaned['publish_time'] = self.df_cleaned['publish_time'].astype('datetime64[us]')
+        self._compact_dtypes()
+        
+        rows_removed = original_rows - self.df_cleaned.shape[0]
+        self.cleaning_steps.append(f"Removed {rows_removed} rows with missing critical data or invalid dates")
+        self.cleaning_steps.append("Converted publish_time to datetime and extracted year/month/quarter")
+        self.cleaning_steps.append("Created new features: word counts, flags, and source type")
+        
+        print(f"Original data: {original_rows} rows")
+        print(f"After cleaning: {self.df_cleaned.shape[0]} rows")
+        print(f"Rows removed: {rows_removed}")
+        
+        return self.df_cleaned
+    
     def get_cleaning_summary(self):
         """Print summary of cleaning steps"""
         print("\n=== CLEANING SUMMARY ===")
@@ -101,6 +294,22 @@ class CORD19Cleaner:
         print(f"  - Abstract: {self.df_cleaned['abstract'].isnull().sum()}")
         print(f"  - Publication year: {self.df_cleaned['publication_year'].isnull().sum()}")
     
-    def get_clean_data(self):
-        """Return the cleaned dataframe"""
+    def get_clean_data(self, save_path='cleaned_metadata.parquet'):
+        """Return the cleaned dataframe, saving it as Parquet"""
+        if save_path:
+            # Parquet keeps the dtypes, so readers need no re-casting
+            self.df_cleaned.to_parquet(save_path, engine='pyarrow', compression='zstd')
         return self.df_cleaned
+
+# Main execution
+if __name__ == "__main__":
+    from data_exploration import CORD19Analyzer
+    
+    # Load only the columns the cleaning steps use
+    analyzer = CORD19Analyzer('metadata.csv')
+    
+    if analyzer.load_data():
+        cleaner = CORD19Cleaner(analyzer.df)
+        cleaner.clean_lazy()
+        cleaner.get_cleaning_summary()
+        cleaner.get_clean_data()
@@ -6,15 +6,29 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Columns referenced by the cleaning and visualization steps
+USED_COLUMNS = ['title', 'abstract', 'publish_time', 'journal', 'source_x']
+
+def _null_count(col):
+    """Count missing values in a column without a full-frame boolean mask"""
+    if isinstance(col.dtype, pd.ArrowDtype):
+        # Arrow arrays keep their null count as metadata
+        return col.array.__arrow_array__().null_count
+    return int(col.isna().sum())
+
 class CORD19Analyzer:
     def __init__(self, file_path):
         self.file_path = file_path
         self.df = None
+        self.source_columns = None
         
     def load_data(self):
         """Load the metadata.csv file"""
         try:
-            self.df = pd.read_csv(self.file_path)
+            # Header peek keeps the full column list for the exploration report
+            self.source_columns = pd.read_csv(self.file_path, nrows=0).columns.tolist()
+            self.df = pd.read_csv(self.file_path, usecols=USED_COLUMNS,
+                                  engine='pyarrow', dtype_backend='pyarrow')
             print("Data loaded successfully!")
             return True
         except FileNotFoundError:
@@ -29,10 +43,10 @@ class CORD19Analyzer:
         print("=== BASIC DATA EXPLORATION ===")
         print(f"Dataset dimensions: {self.df.shape}")
         print(f"Number of rows: {self.df.shape[0]:,}")
-        print(f"Number of columns: {self.df.shape[1]}")
+        print(f"Number of columns: {len(self.source_columns)} ({self.df.shape[1]} loaded)")
         
         print("\n=== COLUMN NAMES ===")
-        print(self.df.columns.tolist())
+        print(self.source_columns)
         
         print("\n=== DATA TYPES ===")
         print(self.df.dtypes)
@@ -43,34 +57,35 @@ class CORD19Analyzer:
     def check_missing_values(self):
         """Analyze missing values in the dataset"""
         print("\n=== MISSING VALUES ANALYSIS ===")
-        missing_data = self.df.isnull().sum()
-        missing_percent = (missing_data / len(self.df)) * 100
+        counts = np.array([_null_count(self.df[c]) for c in self.df.columns])
+        cols = np.array(self.df.columns)
         
-        missing_df = pd.DataFrame({
-            'Column': missing_data.index,
-            'Missing_Count': missing_data.values,
-            'Missing_Percent': missing_percent.values
-        })
+        # Keep only columns with missing values
+        keep = counts > 0
+        counts, cols = counts[keep], cols[keep]
         
-        missing_df = missing_df[missing_df['Missing_Count'] > 0].sort_values('Missing_Percent', ascending=False)
+        missing_df = pd.DataFrame({
+            'Column': cols,
+            'Missing_Count': counts,
+            'Missing_Percent': counts / len(self.df) * 100
+        }).sort_values('Missing_Percent', ascending=False)
         
         print("Columns with missing values:")
         print(missing_df)
         
         # Plot missing values
         if len(missing_df) > 0:
+            top = missing_df.head(10)
+            
             plt.figure(figsize=(12, 6))
-            bars = plt.bar(missing_df['Column'][:10], missing_df['Missing_Percent'][:10])
+            bars = plt.bar(top['Column'], top['Missing_Percent'])
             plt.title('Top 10 Columns with Missing Values (%)')
             plt.xlabel('Columns')
             plt.ylabel('Percentage Missing')
             plt.xticks(rotation=45, ha='right')
             
             # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{height:.1f}%', ha='center', va='bottom')
+            plt.gca().bar_label(bars, fmt='%.1f%%')
             
             plt.tight_layout()
             plt.savefig('missing_values.png', dpi=300, bbox_inches='tight')